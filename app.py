@@ -1,15 +1,35 @@
-from flask import Flask, jsonify, request, send_from_directory, session
+from flask import Flask, abort, after_this_request, jsonify, request, send_from_directory, session
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from flasgger import Swagger
-from dotenv import load_dotenv, set_key
+from dotenv import load_dotenv
+from dotenv.parser import parse_stream
+from werkzeug.exceptions import HTTPException
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
+import re
+import sys
 import json
+import decimal
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import secrets
+import gzip
+import tempfile
 import hmac
+import hashlib
+import itertools
+import mimetypes
+import threading
+import time
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlencode, urlparse
 from datetime import timedelta
+from types import MappingProxyType
 
 # Persistent state lives in /app/data so the directory can be volume-mounted
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
@@ -18,9 +38,47 @@ ENV_FILE = os.path.join(DATA_DIR, '.env')
 # Load environment variables from data/.env (falls back to process env if absent)
 load_dotenv(ENV_FILE)
 
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, so jsonify() encodes in C"""
+
+    option = orjson.OPT_NON_STR_KEYS
+    mimetype = 'application/json'
+
+    @staticmethod
+    def _default(o):
+        # orjson covers datetimes, UUIDs and dataclasses natively
+        if isinstance(o, decimal.Decimal):
+            return str(o)
+        if hasattr(o, '__html__'):
+            return str(o.__html__())
+        raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+    def dumpb(self, obj):
+        """Encode straight to bytes (with jsonify's trailing newline)."""
+        return orjson.dumps(obj, default=self._default, option=self.option | orjson.OPT_APPEND_NEWLINE)
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self._default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumpb(obj), mimetype=self.mimetype)
+
+
 app = Flask(__name__, static_folder='static')
+app.json = OrjsonProvider(app)
 CORS(app)
 
+# Number of reverse proxies (e.g. an HTTP/2 nginx/Caddy front end) whose
+# X-Forwarded-* headers are trusted; 0 means the app is reached directly
+TRUSTED_PROXIES = int(os.getenv('TRUSTED_PROXIES', '0'))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES, x_proto=TRUSTED_PROXIES,
+                            x_host=TRUSTED_PROXIES)
+
 # --- Authentication Setup ---
 # Mutable auth state (updated at runtime when setup/regenerate is called)
 _auth = {
@@ -29,24 +87,71 @@ _auth = {
     'session_secret': os.getenv('SESSION_SECRET', ''),
 }
 
-def _ensure_env_file():
-    os.makedirs(DATA_DIR, exist_ok=True)
-    if not os.path.exists(ENV_FILE):
-        with open(ENV_FILE, 'w') as f:
-            f.write('')
+# Serializes read-merge-replace cycles so concurrent saves don't drop each other's keys
+_env_lock = threading.Lock()
+
+def _env_line(key, value, export=False):
+    escaped = value.replace("'", "\\'")
+    return f"{'export ' if export else ''}{key}='{escaped}'\n"
+
+def _write_env(updates):
+    """Merge updates into data/.env with a single atomic rewrite (skipped if nothing changes).
+
+    Like dotenv's set_key, only the lines for the updated keys are rewritten
+    (keeping an `export` prefix); comments, blank lines and other entries are
+    copied verbatim, and new keys are appended.
+    """
+    with _env_lock:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        bindings = []
+        if os.path.exists(ENV_FILE):
+            with open(ENV_FILE) as f:
+                bindings = list(parse_stream(f))
+        current = {b.key: b.value for b in bindings if b.key is not None}
+        if all(key in current and current[key] == value for key, value in updates.items()):
+            return
+
+        lines = []
+        written = set()
+        for binding in bindings:
+            original = binding.original.string
+            if binding.key not in updates:
+                lines.append(original)
+            elif binding.key not in written:
+                lines.append(_env_line(binding.key, updates[binding.key],
+                                       export=original.lstrip().startswith('export ')))
+                written.add(binding.key)
+        if lines and not lines[-1].endswith('\n'):
+            lines[-1] += '\n'
+        lines.extend(_env_line(key, value) for key, value in updates.items() if key not in written)
+
+        with tempfile.NamedTemporaryFile('w', dir=DATA_DIR, delete=False) as tmp:
+            tmp.writelines(lines)
+        os.replace(tmp.name, ENV_FILE)
+
+def _set_api_token(token):
+    """Store the API token along with the bytes that Bearer tokens are checked against."""
+    _auth['api_token'] = token
+    _auth['api_token_bytes'] = token.encode()
+
+# Secrets generated on first run, persisted together in one .env rewrite
+_generated = {}
 
 # Generate API_TOKEN if missing
 if not _auth['api_token']:
-    _auth['api_token'] = secrets.token_hex(32)
-    _ensure_env_file()
-    set_key(ENV_FILE, 'API_TOKEN', _auth['api_token'])
+    _set_api_token(secrets.token_hex(32))
+    _generated['API_TOKEN'] = _auth['api_token']
     print(f"Generated API_TOKEN for script access (visible in Settings).")
+else:
+    _set_api_token(_auth['api_token'])
 
 # Generate SESSION_SECRET if missing
 if not _auth['session_secret']:
     _auth['session_secret'] = secrets.token_hex(32)
-    _ensure_env_file()
-    set_key(ENV_FILE, 'SESSION_SECRET', _auth['session_secret'])
+    _generated['SESSION_SECRET'] = _auth['session_secret']
+
+if _generated:
+    _write_env(_generated)
 
 app.secret_key = _auth['session_secret']
 app.permanent_session_lifetime = timedelta(days=30)
@@ -65,12 +170,34 @@ def login_required(f):
         # Check Bearer token (API token for scripts)
         auth_header = request.headers.get('Authorization', '')
         if auth_header.startswith('Bearer '):
-            token = auth_header[7:]
-            if hmac.compare_digest(token, _auth['api_token']):
+            token = auth_header[7:].encode()
+            if hmac.compare_digest(token, _auth['api_token_bytes']):
                 return f(*args, **kwargs)
         return jsonify({'error': 'Authentication required'}), 401
     return decorated_function
 
+
+@app.errorhandler(HTTPException)
+def handle_http_error(e):
+    """Return JSON errors from /api routes, including unhandled exceptions (500).
+
+    Routes only catch the DigitalOcean request errors they can map to a status;
+    anything else is logged by Flask once and ends up here.
+    """
+    if request.path.startswith('/api/'):
+        return jsonify({'error': e.description}), e.code
+    return e
+
+
+def request_json_object(silent=False):
+    """Return the request's JSON body as a dict ({} when empty); 400 unless it is an object."""
+    data = request.get_json(silent=silent)
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        abort(400, description='Request body must be a JSON object')
+    return data
+
 # Swagger configuration
 swagger_config = {
     "headers": [],
@@ -117,104 +244,613 @@ swagger_template = {
 
 swagger = Swagger(app, config=swagger_config, template=swagger_template)
 
-# DigitalOcean credentials and configuration (mutable for runtime updates)
-config = {
+# DigitalOcean credentials and configuration. Read through the read-only
+# `config` view; runtime changes go through update_config() only.
+_config = {
     'API_TOKEN': os.getenv('DO_API_TOKEN'),
     'DNS_ZONE': os.getenv('DO_DNS_ZONE')
 }
+config = MappingProxyType(_config)
 
-# Legacy support - keep these for compatibility
-API_TOKEN = config['API_TOKEN']
-DNS_ZONE = config['DNS_ZONE']
+# config key -> variable name in data/.env
+_CONFIG_ENV_KEYS = {'API_TOKEN': 'DO_API_TOKEN', 'DNS_ZONE': 'DO_DNS_ZONE'}
 
 # DigitalOcean API base URL
 DO_API_BASE = "https://api.digitalocean.com/v2"
 
-def is_config_complete():
-    """Check if all required configuration is present"""
+# (connect, read) timeout for every call to the DigitalOcean API
+DO_TIMEOUT = (3.05, 15)
+
+
+def _build_do_session():
+    """Create a pooled keep-alive session for DigitalOcean API calls"""
+    s = requests.Session()
+    # Retry-After is honoured on 429/503; POSTs are not retried (not idempotent).
+    # Once retries run out the last response is returned, not raised, so callers
+    # report DigitalOcean's own status and message. Read timeouts are not retried
+    # (read=False) so they surface as requests' Timeout within DO_TIMEOUT and are
+    # answered with 504, rather than as a ConnectionError after several waits
+    retries = Retry(total=3, read=False, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504],
+                    respect_retry_after_header=True, raise_on_status=False)
+    s.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=retries))
+    s.headers.update({'Content-Type': 'application/json'})
+    return s
+
+# Shared across requests so TLS connections to the API are reused
+do_session = _build_do_session()
+
+
+def _sync_session_auth():
+    """Keep the session Authorization header in step with the configured token"""
+    if config.get('API_TOKEN'):
+        do_session.headers['Authorization'] = f"Bearer {config['API_TOKEN']}"
+    else:
+        do_session.headers.pop('Authorization', None)
+
+_sync_session_auth()
+
+
+# DigitalOcean allows 250 requests per minute per token
+DO_RATE_LIMIT = 250
+
+
+class _TokenBucket:
+    """Client-side rate limiter: bursts up to capacity, refilled at rate per second.
+
+    acquire() reserves a token and sleeps (outside the lock) until it is due, so
+    bursts of batch operations or page fetches queue here instead of drawing 429s.
+    """
+
+    def __init__(self, rate, capacity):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+_do_rate_limiter = _TokenBucket(DO_RATE_LIMIT / 60, DO_RATE_LIMIT)
+
+def _check_config_complete():
     return all([
         config.get('API_TOKEN'),
         config.get('DNS_ZONE')
     ])
 
+# Recomputed only when the configuration changes (see update_config)
+_config_complete = _check_config_complete()
+
+def is_config_complete():
+    """Check if all required configuration is present"""
+    return _config_complete
+
 def update_config(new_config):
     """Update the configuration in memory and .env file"""
-    global config, API_TOKEN, DNS_ZONE
-    
-    config.update(new_config)
-    
-    # Update global variables
-    API_TOKEN = config['API_TOKEN']
-    DNS_ZONE = config['DNS_ZONE']
+    global _config_complete
+
+    if not new_config.get('API_TOKEN', config.get('API_TOKEN')):
+        raise ValueError("DigitalOcean API token is not configured")
+
+    # Re-saving the same settings is a no-op: no cache reset, no .env rewrite
+    changed = {key: value for key, value in new_config.items() if config.get(key) != value}
+    if not changed:
+        return
+
+    _config.update(changed)
+    _config_complete = _check_config_complete()
+    _refresh_config_payloads()
+    _sync_session_auth()
+    _refresh_do_paths()
+    invalidate_records_cache()
     
     # Save to data/.env
-    _ensure_env_file()
-    set_key(ENV_FILE, 'DO_API_TOKEN', config['API_TOKEN'])
-    set_key(ENV_FILE, 'DO_DNS_ZONE', config['DNS_ZONE'])
+    _write_env({_CONFIG_ENV_KEYS[key]: value for key, value in changed.items()})
 
-# DigitalOcean API helper functions
-def get_headers():
-    """Get headers for DigitalOcean API requests"""
-    if not config.get('API_TOKEN'):
-        raise ValueError("DigitalOcean API token is not configured")
-    return {
-        'Authorization': f"Bearer {config['API_TOKEN']}",
-        'Content-Type': 'application/json'
-    }
+def _json_body(obj):
+    """Encode obj the way jsonify() would, for responses built ahead of time."""
+    return app.json.dumpb(obj)
+
+# Serialized GET /api/config and /api/config/status bodies; both only change
+# when update_config() runs, so they are rebuilt there rather than per request
+_config_payloads = {'config': b'', 'status': b''}
+
+def _refresh_config_payloads():
+    complete = is_config_complete()
+    api_token = config.get('API_TOKEN', '')
+    masked_token = api_token if api_token else ''
+
+    _config_payloads['status'] = _json_body({
+        'configured': complete,
+        'zone': config.get('DNS_ZONE') if complete else None
+    })
+    _config_payloads['config'] = _json_body({
+        'api_token': masked_token,
+        'dns_zone': config.get('DNS_ZONE', ''),
+        'has_token': bool(api_token)
+    })
+
+_refresh_config_payloads()
 
+# DigitalOcean API helper functions
 def make_do_request(method, endpoint, data=None):
-    """Make a request to DigitalOcean API"""
-    url = f"{DO_API_BASE}{endpoint}"
-    headers = get_headers()
-
-    if method == 'GET':
-        response = requests.get(url, headers=headers)
-    elif method == 'POST':
-        response = requests.post(url, headers=headers, json=data)
-    elif method == 'PUT':
-        response = requests.put(url, headers=headers, json=data)
-    elif method == 'DELETE':
-        response = requests.delete(url, headers=headers)
-    else:
+    """Make a request to DigitalOcean API
+
+    Authentication comes from the session headers, which _sync_session_auth()
+    sets whenever the token changes; callers check is_config_complete() first.
+    """
+    if method not in ('GET', 'POST', 'PUT', 'DELETE'):
         raise ValueError(f"Unsupported HTTP method: {method}")
 
-    return response
+    _do_rate_limiter.acquire()
+    # GET bodies are only read once the caller has checked the status; reading
+    # them (or close()) hands the connection back to the pool
+    return do_session.request(method, f"{DO_API_BASE}{endpoint}", json=data,
+                              timeout=DO_TIMEOUT, stream=(method == 'GET'))
 
 
-def fetch_all_domain_records():
-    """Fetch all DNS records with pagination (DigitalOcean paginates at 20 by default)."""
-    all_records = []
-    page = 1
-    per_page = 200  # DigitalOcean allows up to 200 per page
+def do_error_message(response):
+    """Return the message from a failed DigitalOcean response in one parse."""
+    try:
+        return response.json().get('message', 'Unknown error')
+    except (ValueError, AttributeError):
+        # Empty body or a non-JSON error page from a proxy in front of the API
+        return 'Unknown error'
+
+
+DO_PAGE_SIZE = 200  # DigitalOcean allows up to 200 per page
+
+# Fetches pages 2..N of a listing concurrently; the worker count also caps how
+# many requests one listing puts in flight against the API rate limit
+_page_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='do-pages')
 
-    while True:
-        response = make_do_request('GET', f"/domains/{config['DNS_ZONE']}/records?page={page}&per_page={per_page}")
 
-        if response.status_code != 200:
-            return None, response
+# Zone-scoped endpoint prefixes; the zone only changes in update_config(),
+# which rebuilds them, so requests don't re-format them every time
+_do_paths = {'records': '', 'page': ''}
 
-        response_data = response.json()
-        all_records.extend(response_data.get('domain_records', []))
 
-        links = response_data.get('links', {})
-        pages = links.get('pages', {})
+def _refresh_do_paths():
+    records = f"/domains/{config.get('DNS_ZONE')}/records"
+    _do_paths['records'] = records
+    _do_paths['page'] = f"{records}?per_page={DO_PAGE_SIZE}&page="
 
-        if 'next' not in pages:
-            break
+_refresh_do_paths()
 
-        page += 1
+
+def records_endpoint(record_id=None):
+    """Endpoint for the zone's record list, or for one record when given its ID."""
+    if record_id is None:
+        return _do_paths['records']
+    return f"{_do_paths['records']}/{record_id}"
+
+
+def _fetch_records_page(page_path, page):
+    return make_do_request('GET', f"{page_path}{page}")
+
+
+def _last_page(response_data):
+    """Read the page count from a DigitalOcean listing's links (or meta.total)."""
+    last_url = response_data.get('links', {}).get('pages', {}).get('last')
+    if last_url:
+        return int(parse_qs(urlparse(last_url).query).get('page', ['1'])[0])
+    total = response_data.get('meta', {}).get('total', 0)
+    return max(1, -(-total // DO_PAGE_SIZE))
+
+
+def fetch_all_domain_records():
+    """Fetch all DNS records with pagination (DigitalOcean paginates at 20 by default).
+
+    The first page tells us how many pages there are; the rest are requested
+    in parallel over the pooled session and stitched back together in order.
+    """
+    # Pinned for the whole listing, in case the zone changes mid-fetch
+    page_path = _do_paths['page']
+    response = _fetch_records_page(page_path, 1)
+    if response.status_code != 200:
+        return None, response
+
+    response_data = response.json()
+    all_records = response_data.get('domain_records', [])
+
+    last_page = _last_page(response_data)
+    if last_page > 1:
+        futures = [_page_pool.submit(_fetch_records_page, page_path, page) for page in range(2, last_page + 1)]
+        for i, future in enumerate(futures):
+            try:
+                response = future.result()
+            except Exception:
+                _discard_pages(futures[i + 1:])
+                raise
+            if response.status_code != 200:
+                _discard_pages(futures[i + 1:])
+                return None, response
+            all_records.extend(response.json().get('domain_records', []))
 
     return all_records, None
 
+
+def _discard_pages(futures):
+    """Close page responses that will not be read, returning their connections."""
+    for future in futures:
+        future.add_done_callback(lambda f: f.exception() or f.result().close())
+
+
+# Short-lived cache of the zone's record list; DNS records change rarely and
+# update/delete would otherwise re-list the whole zone just to resolve an ID
+RECORDS_CACHE_TTL = 60
+# For this long past expiry the old listing is still served while a background
+# thread refetches it, so readers don't wait on DigitalOcean; after that they do
+RECORDS_CACHE_STALE = 300
+# 'generation' changes whenever the listing is replaced or patched, so a
+# background refresh that raced a write can tell its result is out of date
+_records_cache = {'data': None, 'index': {}, 'expires': 0.0, 'generation': 0, 'refreshing': False}
+_records_cache_lock = threading.Lock()
+
+
+def _refresh_records_locked(ttl):
+    """Refetch the listing if expired; caller must hold _records_cache_lock."""
+    if _records_cache['data'] is not None:
+        now = time.monotonic()
+        if now < _records_cache['expires']:
+            return _records_cache['data'], None
+        if now < _records_cache['expires'] + RECORDS_CACHE_STALE:
+            _start_background_refresh_locked(ttl)
+            return _records_cache['data'], None
+
+    records, err_response = fetch_all_domain_records()
+    if err_response is None:
+        _store_records_locked(records)
+        _records_cache['expires'] = time.monotonic() + ttl
+    return records, err_response
+
+
+def _store_records_locked(records):
+    """Replace the cached listing and its (name, type) -> id index."""
+    # The first match wins, as with the old linear scan
+    index = {}
+    for rec in records:
+        index.setdefault((rec.get('name'), rec.get('type')), rec.get('id'))
+    _records_cache['data'] = records
+    _records_cache['index'] = index
+    _records_cache['generation'] += 1
+
+
+def _start_background_refresh_locked(ttl):
+    """Refetch the listing on a daemon thread unless one is already running."""
+    if _records_cache['refreshing']:
+        return
+    _records_cache['refreshing'] = True
+    threading.Thread(target=_background_refresh, args=(_records_cache['generation'], ttl),
+                     name='records-refresh', daemon=True).start()
+
+
+def _background_refresh(generation, ttl):
+    records = err_response = None
+    try:
+        records, err_response = fetch_all_domain_records()
+    except requests.exceptions.RequestException:
+        app.logger.warning("Background refresh of DNS records failed", exc_info=True)
+    finally:
+        with _records_cache_lock:
+            _records_cache['refreshing'] = False
+            # Keep the cached listing if a write or config change landed meanwhile
+            if records is not None and _records_cache['generation'] == generation:
+                _store_records_locked(records)
+                _records_cache['expires'] = time.monotonic() + ttl
+    if err_response is not None:
+        err_response.close()
+
+
+def fetch_records_cached(ttl=RECORDS_CACHE_TTL, refresh=False):
+    """Return (records, error_response) from the cache, refetching once it expires.
+
+    A listing that expired less than RECORDS_CACHE_STALE seconds ago is returned
+    as is while a background thread fetches the new one. refresh=True skips the
+    cache and waits for a fresh listing.
+    """
+    with _records_cache_lock:
+        if refresh:
+            _records_cache['expires'] = float('-inf')
+        return _refresh_records_locked(ttl)
+
+
+def lookup_record_id(record_name, record_type):
+    """Return the ID of the first record matching name and type, or None.
+
+    Uses the cached listing's index when there is one. On a miss (or with
+    nothing cached) DigitalOcean is asked for just that name and type, since
+    the listing may predate records added elsewhere.
+    """
+    if not isinstance(record_name, str) or not isinstance(record_type, str):
+        return None
+    with _records_cache_lock:
+        if _records_cache['data'] is not None:
+            _, err_response = _refresh_records_locked(RECORDS_CACHE_TTL)
+            if err_response is not None:
+                err_response.close()
+            else:
+                record_id = _records_cache['index'].get((record_name, record_type))
+                if record_id:
+                    return record_id
+    return _query_record_id(record_name, record_type)
+
+
+def is_record_id(value):
+    """True for a usable DigitalOcean record ID: a positive integer or a string of digits."""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return value > 0
+    return isinstance(value, str) and value.isdigit()
+
+
+# Requests that arrived without a record ID, counted for the warning below
+_id_lookups = itertools.count(1)
+
+def _mark_id_lookup():
+    """Flag the current response as having resolved the record ID by name and type."""
+    app.logger.warning("%s %s sent no record ID; resolving it by name and type (%d since start)",
+                       request.method, request.path, next(_id_lookups))
+
+    @after_this_request
+    def add_header(response):
+        response.headers['X-Slow-Path'] = 'lookup'
+        return response
+
+
+def _query_record_id(record_name, record_type):
+    """Look one record up with DigitalOcean's name/type filters (name must be the FQDN)."""
+    zone = config['DNS_ZONE']
+    fqdn = zone if record_name == '@' else f"{record_name}.{zone}"
+    query = urlencode({'type': record_type, 'name': fqdn, 'per_page': 20})
+    response = make_do_request('GET', f"{records_endpoint()}?{query}")
+    if response.status_code != 200:
+        response.close()
+        return None
+    for rec in response.json().get('domain_records', []):
+        if rec.get('name') == record_name and rec.get('type') == record_type:
+            return rec.get('id')
+    return None
+
+
+def send_record_request(method, record_id, data=None, lookup=None):
+    """Send method to one record's endpoint; returns (response, record_id).
+
+    lookup is the (name, type) the ID was resolved from, if any. A 404 for such
+    an ID means the cached listing is stale (the record was deleted or
+    re-created elsewhere), so the ID is dropped from the cache, resolved again
+    with DigitalOcean's filter and the request retried once.
+    """
+    response = make_do_request(method, records_endpoint(record_id), data)
+    if response.status_code != 404 or lookup is None:
+        return response, record_id
+    cache_deleted_record(record_id)
+    fresh_id = _query_record_id(*lookup)
+    if not fresh_id or str(fresh_id) == str(record_id):
+        return response, record_id
+    response.close()
+    return make_do_request(method, records_endpoint(fresh_id), data), fresh_id
+
+
+def invalidate_records_cache():
+    """Drop the cached record list after a change to the zone."""
+    with _records_cache_lock:
+        _records_cache['data'] = None
+        _records_cache['index'] = {}
+        _records_cache['expires'] = 0.0
+        _records_cache['generation'] += 1
+
+
+def _patch_records_cache(record_id, record=None):
+    """Swap one record in the cached listing (or drop it when record is None).
+
+    A new list is stored rather than editing in place, so anything holding the
+    previous listing (e.g. the serialized /api/records body) sees it change.
+    """
+    with _records_cache_lock:
+        records = _records_cache['data']
+        if records is None:
+            return
+        record_id = str(record_id)
+        updated = [rec for rec in records if str(rec.get('id')) != record_id]
+        if record is not None:
+            updated.append(record)
+        _store_records_locked(updated)
+
+
+def cache_saved_record(response):
+    """Fold the record returned by a successful create/update into the cache."""
+    try:
+        record = response.json().get('domain_record') if response.content else None
+    except ValueError:
+        record = None
+    if not record or 'id' not in record:
+        invalidate_records_cache()
+        return
+    _patch_records_cache(record['id'], record)
+
+
+def cache_deleted_record(record_id):
+    """Remove a successfully deleted record from the cache."""
+    _patch_records_cache(record_id)
+
+def format_records(all_domain_records, zone):
+    """Reshape raw DigitalOcean records into the API's record format."""
+    fqdn_suffix = '.' + zone
+    records = []
+    append = records.append
+    for record in all_domain_records:
+        get = record.get
+        name = get('name')
+        rtype = get('type')
+        data_value = get('data')
+
+        # Extract record values based on type
+        if rtype == 'MX':
+            values = [f"{get('priority', 0)} {data_value}"]
+        elif rtype == 'SRV':
+            values = [f"{get('priority', 0)} {get('weight', 0)} {get('port', 0)} {data_value}"]
+        else:
+            values = [data_value] if data_value else []
+
+        append({
+            'name': name,
+            'type': rtype,
+            'ttl': get('ttl'),
+            'id': get('id'),
+            'fqdn': zone if name == '@' else f"{name}{fqdn_suffix}",
+            'values': values
+        })
+    return records
+
+# Serialized /api/records body for the current cached listing, so repeat
+# polls reuse the same bytes and ETag until the record cache is refreshed
+_records_body = {'entry': None}
+
+def _records_payload(all_domain_records, zone):
+    """Return (body, gzipped_body, etag, record_count) for the GET /api/records response."""
+    entry = _records_body['entry']
+    if entry is not None and entry[0] is all_domain_records and entry[1] == zone:
+        return entry[2:]
+
+    records = format_records(all_domain_records, zone)
+    body = _json_body({'records': records, 'zone': zone})
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+    _records_body['entry'] = (all_domain_records, zone, body, _gzip_body(body), etag, len(records))
+    return _records_body['entry'][2:]
+
+# Record-type specific value parsing. Each builder fills in the DigitalOcean
+# fields for one type, raising ValueError with a user-facing message on bad input.
+def _fqdn(value):
+    return value if value.endswith('.') else value + '.'
+
+def _build_plain(values, out):
+    out['data'] = values[0]
+
+def _build_hostname(values, out):
+    out['data'] = _fqdn(values[0])
+
+def _build_cname(values, out):
+    if len(values) > 1:
+        raise ValueError('CNAME records can only have one value')
+    out['data'] = _fqdn(values[0])
+
+# MX "priority exchange" and SRV "priority weight port target", matched in one go
+_MX_VALUE = re.compile(r'\s*(\d{1,5})\s+(\S.*)', re.ASCII | re.DOTALL)
+_SRV_VALUE = re.compile(r'\s*(\d{1,5})\s+(\d{1,5})\s+(\d{1,5})\s+(\S.*)', re.ASCII | re.DOTALL)
+
+def _build_mx(values, out):
+    match = _MX_VALUE.fullmatch(values[0])
+    if match is None:
+        raise ValueError('MX record must be in format: "priority exchange"')
+    priority, exchange = match.groups()
+    out['priority'] = int(priority)
+    out['data'] = _fqdn(exchange)
+
+def _build_srv(values, out):
+    match = _SRV_VALUE.fullmatch(values[0])
+    if match is None:
+        raise ValueError('SRV record must be in format: "priority weight port target"')
+    priority, weight, port, target = match.groups()
+    out['priority'] = int(priority)
+    out['weight'] = int(weight)
+    out['port'] = int(port)
+    out['data'] = _fqdn(target)
+
+RECORD_BUILDERS = {
+    'A': _build_plain,
+    'AAAA': _build_plain,
+    'TXT': _build_plain,
+    'CNAME': _build_cname,
+    'NS': _build_hostname,
+    'MX': _build_mx,
+    'SRV': _build_srv,
+}
+
+def apply_record_builder(record_type, values, out):
+    """Fill in out for record_type from values; returns a user-facing error or None."""
+    builder = RECORD_BUILDERS.get(record_type) if isinstance(record_type, str) else None
+    if builder is None:
+        return f'Unsupported record type: {record_type}'
+    try:
+        builder(values, out)
+    except ValueError as e:
+        return str(e)
+    except (KeyError, IndexError, TypeError):
+        # values was not a list of strings (e.g. an object or numbers)
+        return f'{record_type} record values must be a list of strings'
+    return None
+
+# Bodies below this size are sent as-is; gzip framing would eat most of the gain
+GZIP_MIN_SIZE = 1024
+
+def _gzip_body(data):
+    """Compress a body that is built once and served many times, or None if not worth it."""
+    if len(data) < GZIP_MIN_SIZE:
+        return None
+    compressed = gzip.compress(data, compresslevel=6, mtime=0)
+    return compressed if len(compressed) < len(data) else None
+
+def _encoded_response(data, gzipped, etag, mimetype):
+    """Respond with the pre-gzipped body when the client accepts gzip."""
+    use_gzip = gzipped is not None and request.accept_encodings['gzip'] > 0
+    response = app.response_class(gzipped if use_gzip else data, mimetype=mimetype)
+    if gzipped is not None:
+        response.vary.add('Accept-Encoding')
+    if use_gzip:
+        response.content_encoding = 'gzip'
+        etag = f"{etag}-gz"
+    response.set_etag(etag)
+    return response
+
+def _load_static_files():
+    """Read static/ into memory once: {relative path: (bytes, gzipped, etag, mimetype)}."""
+    files = {}
+    for dirpath, _, filenames in os.walk(app.static_folder):
+        for filename in filenames:
+            full_path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(full_path, app.static_folder).replace(os.sep, '/')
+            with open(full_path, 'rb') as f:
+                data = f.read()
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            etag = hashlib.blake2b(data, digest_size=16).hexdigest()
+            files[rel_path] = (data, _gzip_body(data), etag, mimetype)
+    return files
+
+# The UI is a handful of small files, so serve them from memory instead of
+# stat+open per hit; debug mode reads from disk so edits show up immediately
+_static_files = _load_static_files()
+
+# The JS and CSS are not fingerprinted, so every asset is revalidated (ETag ->
+# 304) rather than cached for a fixed time; after an upgrade a page never runs
+# against scripts left over from the previous release
+def _send_static(path):
+    entry = None if app.debug else _static_files.get(path)
+    if entry is None:
+        return send_from_directory('static', path, max_age=0)
+
+    response = _encoded_response(*entry)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
 @app.route('/')
 def index():
     """Serve the main HTML page"""
-    return send_from_directory('static', 'index.html')
+    return _send_static('index.html')
 
 @app.route('/<path:path>')
 def serve_static(path):
     """Serve static files"""
-    return send_from_directory('static', path)
+    return _send_static(path)
 
 @app.route('/api/auth/setup-required', methods=['GET'])
 def auth_setup_required():
@@ -258,14 +894,13 @@ def auth_setup():
     if not is_setup_required():
         return jsonify({'error': 'Admin password is already configured'}), 400
 
-    data = request.json or {}
+    data = request_json_object()
     password = data.get('password', '')
     if len(password) < 8:
         return jsonify({'error': 'Password must be at least 8 characters'}), 400
 
     _auth['password_hash'] = generate_password_hash(password)
-    _ensure_env_file()
-    set_key(ENV_FILE, 'ADMIN_PASSWORD_HASH', _auth['password_hash'])
+    _write_env({'ADMIN_PASSWORD_HASH': _auth['password_hash']})
 
     session.permanent = True
     session['authenticated'] = True
@@ -301,7 +936,7 @@ def auth_login():
     if is_setup_required():
         return jsonify({'error': 'Please complete setup first'}), 400
 
-    data = request.json or {}
+    data = request_json_object()
     password = data.get('password', '')
     if check_password_hash(_auth['password_hash'], password):
         session.permanent = True
@@ -340,8 +975,8 @@ def auth_status():
     if not authenticated:
         auth_header = request.headers.get('Authorization', '')
         if auth_header.startswith('Bearer '):
-            token = auth_header[7:]
-            authenticated = hmac.compare_digest(token, _auth['api_token'])
+            token = auth_header[7:].encode()
+            authenticated = hmac.compare_digest(token, _auth['api_token_bytes'])
     return jsonify({'authenticated': authenticated})
 
 
@@ -372,9 +1007,8 @@ def regenerate_api_token():
       200:
         description: New API token
     """
-    _auth['api_token'] = secrets.token_hex(32)
-    _ensure_env_file()
-    set_key(ENV_FILE, 'API_TOKEN', _auth['api_token'])
+    _set_api_token(secrets.token_hex(32))
+    _write_env({'API_TOKEN': _auth['api_token']})
     return jsonify({'success': True, 'api_token': _auth['api_token']})
 
 
@@ -407,7 +1041,7 @@ def change_password():
       401:
         description: Current password is incorrect
     """
-    data = request.get_json()
+    data = request_json_object()
     current_password = data.get('current_password', '')
     new_password = data.get('new_password', '')
 
@@ -422,8 +1056,7 @@ def change_password():
 
     new_hash = generate_password_hash(new_password)
     _auth['password_hash'] = new_hash
-    _ensure_env_file()
-    set_key(ENV_FILE, 'ADMIN_PASSWORD_HASH', new_hash)
+    _write_env({'ADMIN_PASSWORD_HASH': new_hash})
 
     return jsonify({'success': True, 'message': 'Password changed successfully'})
 
@@ -480,14 +1113,7 @@ def config_status():
             error:
               type: string
     """
-    try:
-        complete = is_config_complete()
-        return jsonify({
-            'configured': complete,
-            'zone': config.get('DNS_ZONE') if complete else None
-        })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    return app.response_class(_config_payloads['status'], mimetype='application/json')
 
 @app.route('/api/config', methods=['GET'])
 @login_required
@@ -521,17 +1147,7 @@ def get_config():
             error:
               type: string
     """
-    try:
-        api_token = config.get('API_TOKEN', '')
-        masked_token = api_token if api_token else ''
-
-        return jsonify({
-            'api_token': masked_token,
-            'dns_zone': config.get('DNS_ZONE', ''),
-            'has_token': bool(api_token)
-        })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    return app.response_class(_config_payloads['config'], mimetype='application/json')
 
 @app.route('/api/config', methods=['POST'])
 @login_required
@@ -591,7 +1207,7 @@ def save_config():
               type: string
     """
     try:
-        data = request.json
+        data = request_json_object()
 
         # Validate required fields
         required_fields = ['api_token', 'dns_zone']
@@ -613,9 +1229,8 @@ def save_config():
             'message': 'Configuration saved successfully',
             'zone': config['DNS_ZONE']
         })
-    except Exception as e:
-        print(f"Error saving configuration: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 @app.route('/api/config/test', methods=['POST'])
 @login_required
@@ -692,69 +1307,57 @@ def test_config():
             error:
               type: string
     """
-    try:
-        data = request.json
+    data = request_json_object()
 
-        # Validate required fields
-        required_fields = ['api_token', 'dns_zone']
-        missing_fields = [field for field in required_fields if not data.get(field)]
+    # Validate required fields
+    required_fields = ['api_token', 'dns_zone']
+    missing_fields = [field for field in required_fields if not data.get(field)]
 
-        if missing_fields:
-            return jsonify({'error': f'Missing required fields: {", ".join(missing_fields)}'}), 400
+    if missing_fields:
+        return jsonify({'error': f'Missing required fields: {", ".join(missing_fields)}'}), 400
 
-        # Try to list records from the domain
-        try:
-            headers = {
-                'Authorization': f"Bearer {data['api_token']}",
-                'Content-Type': 'application/json'
-            }
-
-            all_records = []
-            page = 1
-            per_page = 200
-            last_status = None
-
-            while True:
-                response = requests.get(
-                    f"{DO_API_BASE}/domains/{data['dns_zone']}/records?page={page}&per_page={per_page}",
-                    headers=headers
-                )
-                last_status = response.status_code
-
-                if response.status_code != 200:
-                    break
-
-                response_data = response.json()
-                all_records.extend(response_data.get('domain_records', []))
-
-                links = response_data.get('links', {})
-                if 'next' not in links.get('pages', {}):
-                    break
-                page += 1
-
-            if last_status == 200:
-                record_count = len(all_records)
-
-                return jsonify({
-                    'success': True,
-                    'message': f'Connection successful! Found {record_count} DNS records.',
-                    'record_count': record_count,
-                    'zone': data['dns_zone']
-                })
-            elif last_status == 401:
-                return jsonify({'error': 'Authentication failed. Please check your API token.'}), 401
-            elif last_status == 404:
-                return jsonify({'error': f'DNS zone "{data["dns_zone"]}" not found in your DigitalOcean account.'}), 404
-            else:
-                error_msg = response.json().get('message', 'Unknown error') if response.text else 'Unknown error'
-                return jsonify({'error': f'Connection failed: {error_msg}'}), last_status
+    # Try to list records from the domain
+    try:
+        headers = {
+            'Authorization': f"Bearer {data['api_token']}",
+            'Content-Type': 'application/json'
+        }
 
-        except requests.exceptions.RequestException as req_error:
-            return jsonify({'error': f'Connection failed: {str(req_error)}'}), 500
+        # A one-record page is enough to validate the token and zone;
+        # DigitalOcean reports the full record count in meta.total
+        _do_rate_limiter.acquire()
+        response = do_session.get(
+            f"{DO_API_BASE}/domains/{data['dns_zone']}/records",
+            params={'per_page': 1},
+            headers=headers,
+            timeout=DO_TIMEOUT
+        )
+        last_status = response.status_code
+
+        if last_status == 200:
+            response_data = response.json()
+            record_count = response_data.get('meta', {}).get(
+                'total', len(response_data.get('domain_records', []))
+            )
+
+            return jsonify({
+                'success': True,
+                'message': f'Connection successful! Found {record_count} DNS records.',
+                'record_count': record_count,
+                'zone': data['dns_zone']
+            })
+        elif last_status == 401:
+            return jsonify({'error': 'Authentication failed. Please check your API token.'}), 401
+        elif last_status == 404:
+            return jsonify({'error': f'DNS zone "{data["dns_zone"]}" not found in your DigitalOcean account.'}), 404
+        else:
+            error_msg = do_error_message(response)
+            return jsonify({'error': f'Connection failed: {error_msg}'}), last_status
 
-    except Exception as e:
-        print(f"Error testing configuration: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+    except requests.exceptions.Timeout:
+        return jsonify({'error': 'Connection failed: timed out waiting for the DigitalOcean API'}), 504
+    except requests.exceptions.RequestException as req_error:
+        return jsonify({'error': f'Connection failed: {str(req_error)}'}), 502
 
 @app.route('/api/records', methods=['GET'])
 @login_required
@@ -765,6 +1368,13 @@ def get_records():
       - DNS Records
     summary: List all DNS records
     description: Retrieve all DNS records from the configured DigitalOcean DNS zone
+    parameters:
+      - in: query
+        name: refresh
+        type: boolean
+        required: false
+        description: Bypass the short-lived server-side record cache and re-list the zone
+        example: true
     responses:
       200:
         description: List of DNS records
@@ -813,54 +1423,29 @@ def get_records():
           properties:
             error:
               type: string
-            details:
-              type: string
     """
     try:
         # Check if configuration is complete
         if not is_config_complete():
             return jsonify({'error': 'DigitalOcean configuration is incomplete. Please configure your credentials.'}), 400
         
-        print(f"Attempting to connect to DigitalOcean DNS Zone: {config['DNS_ZONE']}")
+        app.logger.debug("Listing DNS records for zone %s", config['DNS_ZONE'])
 
-        all_domain_records, err_response = fetch_all_domain_records()
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+        all_domain_records, err_response = fetch_records_cached(refresh=refresh)
         if err_response is not None:
-            error_msg = err_response.json().get('message', 'Unknown error')
+            error_msg = do_error_message(err_response)
             return jsonify({'error': f'Failed to fetch records: {error_msg}'}), err_response.status_code
 
-        records = []
-        for record in all_domain_records:
-            record_data = {
-                'name': record.get('name'),
-                'type': record.get('type'),
-                'ttl': record.get('ttl'),
-                'id': record.get('id'),
-                'fqdn': f"{record.get('name')}.{config['DNS_ZONE']}" if record.get('name') != '@' else config['DNS_ZONE']
-            }
-            
-            # Extract record values based on type
-            data_value = record.get('data')
-            if record.get('type') == 'MX':
-                priority = record.get('priority', 0)
-                record_data['values'] = [f"{priority} {data_value}"]
-            elif record.get('type') == 'SRV':
-                priority = record.get('priority', 0)
-                weight = record.get('weight', 0)
-                port = record.get('port', 0)
-                record_data['values'] = [f"{priority} {weight} {port} {data_value}"]
-            else:
-                record_data['values'] = [data_value] if data_value else []
-            
-            records.append(record_data)
-        
-        print(f"Successfully retrieved {len(records)} records")
-        return jsonify({'records': records, 'zone': config['DNS_ZONE']})
-    except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"ERROR: {str(e)}")
-        print(error_details)
-        return jsonify({'error': str(e), 'details': error_details}), 500
+        body, gzipped, etag, count = _records_payload(all_domain_records, config['DNS_ZONE'])
+        app.logger.debug("Retrieved %d records", count)
+
+        response = _encoded_response(body, gzipped, etag, 'application/json')
+        return response.make_conditional(request)
+    except requests.exceptions.Timeout:
+        return jsonify({'error': 'Timed out waiting for the DigitalOcean API'}), 504
+    except requests.exceptions.RequestException as e:
+        return jsonify({'error': f'DigitalOcean API request failed: {str(e)}'}), 502
 
 @app.route('/api/records', methods=['POST'])
 @login_required
@@ -929,7 +1514,7 @@ def create_record():
               type: string
     """
     try:
-        data = request.json
+        data = request_json_object()
         record_name = data.get('name')
         record_type = data.get('type')
         ttl = data.get('ttl', 3600)
@@ -948,48 +1533,25 @@ def create_record():
             'ttl': ttl
         }
         
-        # Handle different record types
-        if record_type in ['A', 'AAAA', 'TXT']:
-            record_data['data'] = values[0]
-        elif record_type in ['CNAME', 'NS']:
-            if len(values) > 1 and record_type == 'CNAME':
-                return jsonify({'error': 'CNAME records can only have one value'}), 400
-            val = values[0]
-            record_data['data'] = val if val.endswith('.') else val + '.'
-        elif record_type == 'MX':
-            # MX format: "priority exchange"
-            parts = values[0].split(' ', 1)
-            if len(parts) == 2:
-                record_data['priority'] = int(parts[0])
-                exchange = parts[1]
-                record_data['data'] = exchange if exchange.endswith('.') else exchange + '.'
-            else:
-                return jsonify({'error': 'MX record must be in format: "priority exchange"'}), 400
-        elif record_type == 'SRV':
-            # SRV format: "priority weight port target"
-            parts = values[0].split(' ', 3)
-            if len(parts) == 4:
-                record_data['priority'] = int(parts[0])
-                record_data['weight'] = int(parts[1])
-                record_data['port'] = int(parts[2])
-                target = parts[3]
-                record_data['data'] = target if target.endswith('.') else target + '.'
-            else:
-                return jsonify({'error': 'SRV record must be in format: "priority weight port target"'}), 400
-        else:
-            return jsonify({'error': f'Unsupported record type: {record_type}'}), 400
+        # Fill in the type-specific fields
+        error = apply_record_builder(record_type, values, record_data)
+        if error:
+            return jsonify({'error': error}), 400
 
         # Create the record via DigitalOcean API
-        response = make_do_request('POST', f"/domains/{config['DNS_ZONE']}/records", record_data)
+        response = make_do_request('POST', records_endpoint(), record_data)
         
         if response.status_code in [200, 201]:
+            cache_saved_record(response)
             return jsonify({'message': 'Record created successfully', 'name': record_name}), 201
         else:
-            error_msg = response.json().get('message', 'Unknown error')
+            error_msg = do_error_message(response)
             return jsonify({'error': f'Failed to create record: {error_msg}'}), response.status_code
             
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    except requests.exceptions.Timeout:
+        return jsonify({'error': 'Timed out waiting for the DigitalOcean API'}), 504
+    except requests.exceptions.RequestException as e:
+        return jsonify({'error': f'DigitalOcean API request failed: {str(e)}'}), 502
 
 @app.route('/api/records/<record_type>/<path:record_name>', methods=['PUT'])
 @login_required
@@ -1034,7 +1596,7 @@ def update_record(record_type, record_name):
             id:
               type: integer
               example: 123456789
-              description: Record ID (optional, will be looked up if not provided)
+              description: Record ID from GET /api/records. Optional, but clients should send it; without it the record is looked up by name and type and the response carries X-Slow-Path lookup
     responses:
       200:
         description: Record updated successfully
@@ -1070,7 +1632,7 @@ def update_record(record_type, record_name):
               type: string
     """
     try:
-        data = request.json
+        data = request_json_object()
         ttl = data.get('ttl', 3600)
         values = data.get('values', [])
         record_id = data.get('id')
@@ -1078,19 +1640,19 @@ def update_record(record_type, record_name):
 
         if not values:
             return jsonify({'error': 'Missing required field: values'}), 400
+        if record_id and not is_record_id(record_id):
+            return jsonify({'error': 'Field id must be a record ID'}), 400
         
         if not is_config_complete():
             return jsonify({'error': 'DigitalOcean configuration is incomplete.'}), 400
         
         # For DigitalOcean, we need to find the record ID first if not provided
+        lookup = None
         if not record_id:
-            # Get all records (with pagination) and find the matching one
-            all_records, err_response = fetch_all_domain_records()
-            if all_records is not None:
-                for rec in all_records:
-                    if rec.get('name') == record_name and rec.get('type') == record_type:
-                        record_id = rec.get('id')
-                        break
+            # Resolve it from the cached (name, type) index of the zone
+            _mark_id_lookup()
+            lookup = (record_name, record_type)
+            record_id = lookup_record_id(*lookup)
 
             if not record_id:
                 return jsonify({'error': f'Record {record_name} ({record_type}) not found'}), 404
@@ -1102,46 +1664,25 @@ def update_record(record_type, record_name):
             'ttl': ttl
         }
         
-        # Handle different record types
-        if record_type in ['A', 'AAAA', 'TXT']:
-            update_data['data'] = values[0]
-        elif record_type in ['CNAME', 'NS']:
-            if len(values) > 1 and record_type == 'CNAME':
-                return jsonify({'error': 'CNAME records can only have one value'}), 400
-            val = values[0]
-            update_data['data'] = val if val.endswith('.') else val + '.'
-        elif record_type == 'MX':
-            parts = values[0].split(' ', 1)
-            if len(parts) == 2:
-                update_data['priority'] = int(parts[0])
-                exchange = parts[1]
-                update_data['data'] = exchange if exchange.endswith('.') else exchange + '.'
-            else:
-                return jsonify({'error': 'MX record must be in format: "priority exchange"'}), 400
-        elif record_type == 'SRV':
-            parts = values[0].split(' ', 3)
-            if len(parts) == 4:
-                update_data['priority'] = int(parts[0])
-                update_data['weight'] = int(parts[1])
-                update_data['port'] = int(parts[2])
-                target = parts[3]
-                update_data['data'] = target if target.endswith('.') else target + '.'
-            else:
-                return jsonify({'error': 'SRV record must be in format: "priority weight port target"'}), 400
-        else:
-            return jsonify({'error': f'Unsupported record type: {record_type}'}), 400
+        # Fill in the type-specific fields
+        error = apply_record_builder(record_type, values, update_data)
+        if error:
+            return jsonify({'error': error}), 400
         
         # Update the record via DigitalOcean API
-        response = make_do_request('PUT', f"/domains/{config['DNS_ZONE']}/records/{record_id}", update_data)
+        response, record_id = send_record_request('PUT', record_id, update_data, lookup)
         
         if response.status_code == 200:
+            cache_saved_record(response)
             return jsonify({'message': 'Record updated successfully', 'name': new_name})
         else:
-            error_msg = response.json().get('message', 'Unknown error')
+            error_msg = do_error_message(response)
             return jsonify({'error': f'Failed to update record: {error_msg}'}), response.status_code
             
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    except requests.exceptions.Timeout:
+        return jsonify({'error': 'Timed out waiting for the DigitalOcean API'}), 504
+    except requests.exceptions.RequestException as e:
+        return jsonify({'error': f'DigitalOcean API request failed: {str(e)}'}), 502
 
 @app.route('/api/records/<record_type>/<path:record_name>', methods=['DELETE'])
 @login_required
@@ -1169,7 +1710,7 @@ def delete_record(record_type, record_name):
         name: id
         type: integer
         required: false
-        description: Record ID (optional, will be looked up if not provided)
+        description: Record ID from GET /api/records. Optional, but clients should send it; without it the record is looked up by name and type and the response carries X-Slow-Path lookup
         example: 123456789
     responses:
       200:
@@ -1211,38 +1752,402 @@ def delete_record(record_type, record_name):
 
         # Get record ID from query parameter or find it
         record_id = request.args.get('id')
+        lookup = None
+        if record_id and not is_record_id(record_id):
+            return jsonify({'error': 'Query parameter id must be a record ID'}), 400
         
         if not record_id:
-            # Get all records (with pagination) and find the matching one
-            all_records, err_response = fetch_all_domain_records()
-            if all_records is not None:
-                for rec in all_records:
-                    if rec.get('name') == record_name and rec.get('type') == record_type:
-                        record_id = rec.get('id')
-                        break
+            # Resolve it from the cached (name, type) index of the zone
+            _mark_id_lookup()
+            lookup = (record_name, record_type)
+            record_id = lookup_record_id(*lookup)
 
             if not record_id:
                 return jsonify({'error': f'Record {record_name} ({record_type}) not found'}), 404
 
         # Delete the record
-        response = make_do_request('DELETE', f"/domains/{config['DNS_ZONE']}/records/{record_id}")
+        response, record_id = send_record_request('DELETE', record_id, lookup=lookup)
         
         if response.status_code == 204:
+            cache_deleted_record(record_id)
             return jsonify({'message': 'Record deleted successfully', 'name': record_name})
         else:
-            error_msg = response.json().get('message', 'Unknown error') if response.text else 'Unknown error'
+            error_msg = do_error_message(response)
             return jsonify({'error': f'Failed to delete record: {error_msg}'}), response.status_code
             
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    except requests.exceptions.Timeout:
+        return jsonify({'error': 'Timed out waiting for the DigitalOcean API'}), 504
+    except requests.exceptions.RequestException as e:
+        return jsonify({'error': f'DigitalOcean API request failed: {str(e)}'}), 502
+
+# Upper bounds for /api/records/batch: operations per call, and concurrent
+# DigitalOcean requests (kept low to stay clear of the API rate limit)
+BATCH_MAX_OPERATIONS = 100
+BATCH_MAX_WORKERS = 8
+
+_BATCH_SUCCESS = {
+    'create': ('POST', (200, 201), 201, 'Record created successfully'),
+    'update': ('PUT', (200,), 200, 'Record updated successfully'),
+    'delete': ('DELETE', (204,), 200, 'Record deleted successfully'),
+}
+
+
+def _plan_batch_operation(op):
+    """Validate one batch operation. Returns (plan, None) or (None, (error, status))."""
+    if not isinstance(op, dict):
+        return None, ('Each operation must be an object', 400)
+    for field in ('op', 'type', 'name', 'new_name'):
+        if op.get(field) is not None and not isinstance(op[field], str):
+            return None, (f'Field {field} must be a string', 400)
+
+    kind = op.get('op')
+    record_type = op.get('type')
+    record_name = op.get('name')
+
+    if kind not in _BATCH_SUCCESS:
+        return None, (f'Unsupported operation: {kind}', 400)
+    if not record_type or not record_name:
+        return None, ('Missing required fields: type, name', 400)
+
+    result_name = op.get('new_name', record_name) if kind == 'update' else record_name
+    body = None
+    if kind != 'delete':
+        values = op.get('values', [])
+        if not values:
+            return None, ('Missing required field: values', 400)
+        body = {'type': record_type, 'name': result_name, 'ttl': op.get('ttl', 3600)}
+        error = apply_record_builder(record_type, values, body)
+        if error:
+            return None, (error, 400)
+
+    record_id = lookup = None
+    if kind != 'create':
+        record_id = op.get('id')
+        if record_id and not is_record_id(record_id):
+            return None, ('Field id must be a record ID', 400)
+        if not record_id:
+            lookup = (record_name, record_type)
+            record_id = lookup_record_id(*lookup)
+        if not record_id:
+            return None, (f'Record {record_name} ({record_type}) not found', 404)
+
+    return (kind, body, result_name, record_id, lookup), None
+
+
+def _run_batch_operation(plan):
+    """Send one planned operation to DigitalOcean and describe the outcome."""
+    kind, body, result_name, record_id, lookup = plan
+    method, ok_codes, status, message = _BATCH_SUCCESS[kind]
+    try:
+        response, record_id = send_record_request(method, record_id, body, lookup)
+    except requests.exceptions.Timeout:
+        return {'status': 504, 'error': f'Failed to {kind} record: timed out waiting for the DigitalOcean API'}
+    except requests.exceptions.RequestException as e:
+        return {'status': 502, 'error': f'Failed to {kind} record: {str(e)}'}
+
+    if response.status_code in ok_codes:
+        if kind == 'delete':
+            cache_deleted_record(record_id)
+        else:
+            cache_saved_record(response)
+        return {'status': status, 'message': message, 'name': result_name}
+    error_msg = do_error_message(response)
+    return {'status': response.status_code, 'error': f'Failed to {kind} record: {error_msg}'}
+
+
+def _apply_batch(operations):
+    """Validate every operation, then run them concurrently; returns a Flask response."""
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return jsonify({'error': f'A batch may contain at most {BATCH_MAX_OPERATIONS} operations'}), 400
+
+    # Several name lookups are cheaper against one zone listing than one query each
+    lookups = sum(1 for op in operations if isinstance(op, dict) and op.get('op') != 'create' and not op.get('id'))
+    if lookups > 1:
+        _, err_response = fetch_records_cached()
+        if err_response is not None:
+            err_response.close()
+
+    plans, errors = zip(*(_plan_batch_operation(op) for op in operations))
+    if any(errors):
+        results = [
+            {'status': err[1], 'error': err[0]} if err else {'status': 424, 'error': 'Not applied'}
+            for err in errors
+        ]
+        return jsonify({'error': 'Batch validation failed; no changes were made', 'results': results}), 400
+
+    with ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(plans))) as pool:
+        results = list(pool.map(_run_batch_operation, plans))
+
+    return jsonify({'results': results})
+
+
+@app.route('/api/records/batch', methods=['POST'])
+@login_required
+def batch_records():
+    """Apply several record changes in one call
+    ---
+    tags:
+      - DNS Records
+    summary: Create, update and delete DNS records in bulk
+    description: >
+      All operations are validated (and record IDs resolved) before any change
+      is sent; if one is invalid nothing is applied. Valid batches are sent to
+      DigitalOcean concurrently and results are returned in request order.
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - operations
+          properties:
+            operations:
+              type: array
+              items:
+                type: object
+                required:
+                  - op
+                  - type
+                  - name
+                properties:
+                  op:
+                    type: string
+                    enum: [create, update, delete]
+                  type:
+                    type: string
+                    example: A
+                  name:
+                    type: string
+                    example: www
+                  new_name:
+                    type: string
+                    description: New record name (update only)
+                  ttl:
+                    type: integer
+                    example: 3600
+                  values:
+                    type: array
+                    items:
+                      type: string
+                    example: ["192.0.2.1"]
+                  id:
+                    type: integer
+                    description: Record ID (optional, looked up if omitted)
+    responses:
+      200:
+        description: Batch processed; see the per-operation status codes
+        schema:
+          type: object
+          properties:
+            results:
+              type: array
+              items:
+                type: object
+                properties:
+                  status:
+                    type: integer
+                    example: 201
+                  message:
+                    type: string
+                  name:
+                    type: string
+                  error:
+                    type: string
+      400:
+        description: Invalid batch; per-operation errors are listed in results
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+            results:
+              type: array
+              items:
+                type: object
+    """
+    try:
+        if not is_config_complete():
+            return jsonify({'error': 'DigitalOcean configuration is incomplete.'}), 400
+
+        data = request_json_object(silent=True)
+        operations = data.get('operations')
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'error': 'Missing required field: operations'}), 400
+
+        return _apply_batch(operations)
+    except requests.exceptions.Timeout:
+        return jsonify({'error': 'Timed out waiting for the DigitalOcean API'}), 504
+    except requests.exceptions.RequestException as e:
+        return jsonify({'error': f'DigitalOcean API request failed: {str(e)}'}), 502
+
+@app.route('/api/records/bulk', methods=['POST'])
+@login_required
+def bulk_create_records():
+    """Create several DNS records in one call
+    ---
+    tags:
+      - DNS Records
+    summary: Create DNS records in bulk
+    description: >
+      Shorthand for a batch of create operations. Records are validated up
+      front; if any is invalid nothing is created. Valid records are created
+      concurrently and results are returned in request order.
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - records
+          properties:
+            records:
+              type: array
+              items:
+                type: object
+                required:
+                  - name
+                  - type
+                  - values
+                properties:
+                  name:
+                    type: string
+                    example: www
+                  type:
+                    type: string
+                    example: A
+                  ttl:
+                    type: integer
+                    example: 3600
+                  values:
+                    type: array
+                    items:
+                      type: string
+                    example: ["192.0.2.1"]
+    responses:
+      200:
+        description: Records processed; see the per-record status codes
+        schema:
+          type: object
+          properties:
+            results:
+              type: array
+              items:
+                type: object
+      400:
+        description: Invalid request; per-record errors are listed in results
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+    """
+    return _apply_bulk('create')
+
+
+@app.route('/api/records/bulk', methods=['PUT'])
+@login_required
+def bulk_update_records():
+    """Update several DNS records in one call
+    ---
+    tags:
+      - DNS Records
+    summary: Update DNS records in bulk
+    description: >
+      Shorthand for a batch of update operations. Records without an id are
+      resolved against a single listing of the zone. Records are validated up
+      front; if any is invalid nothing is changed. Valid updates are sent
+      concurrently and results are returned in request order.
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - records
+          properties:
+            records:
+              type: array
+              items:
+                type: object
+                required:
+                  - name
+                  - type
+                  - values
+                properties:
+                  id:
+                    type: integer
+                    example: 123456789
+                  name:
+                    type: string
+                    example: www
+                  new_name:
+                    type: string
+                    example: web
+                  type:
+                    type: string
+                    example: A
+                  ttl:
+                    type: integer
+                    example: 3600
+                  values:
+                    type: array
+                    items:
+                      type: string
+                    example: ["192.0.2.1"]
+    responses:
+      200:
+        description: Records processed; see the per-record status codes
+        schema:
+          type: object
+          properties:
+            results:
+              type: array
+              items:
+                type: object
+      400:
+        description: Invalid request; per-record errors are listed in results
+        schema:
+          type: object
+          properties:
+            error:
+              type: string
+    """
+    return _apply_bulk('update')
+
+
+def _apply_bulk(kind):
+    """Run the request's records as a batch of `kind` operations."""
+    try:
+        if not is_config_complete():
+            return jsonify({'error': 'DigitalOcean configuration is incomplete.'}), 400
+
+        data = request_json_object(silent=True)
+        records = data.get('records')
+        if not isinstance(records, list) or not records:
+            return jsonify({'error': 'Missing required field: records'}), 400
+
+        return _apply_batch([
+            dict(record, op=kind) if isinstance(record, dict) else record
+            for record in records
+        ])
+    except requests.exceptions.Timeout:
+        return jsonify({'error': 'Timed out waiting for the DigitalOcean API'}), 504
+    except requests.exceptions.RequestException as e:
+        return jsonify({'error': f'DigitalOcean API request failed: {str(e)}'}), 502
 
 # ---------------------------------------------------------------------------
 # MCP (Model Context Protocol) integration
 # ---------------------------------------------------------------------------
 
+# Read from the environment once; save_mcp_config() keeps it current after that
+_mcp_enabled = os.getenv('MCP_ENABLED', '').lower() in ('true', '1', 'yes')
+
 def is_mcp_enabled():
     """Check if MCP is enabled via env var or saved config."""
-    return os.getenv('MCP_ENABLED', '').lower() in ('true', '1', 'yes')
+    return _mcp_enabled
 
 
 @app.route('/api/config/mcp', methods=['GET'])
@@ -1281,28 +2186,61 @@ def save_mcp_config():
       200:
         description: MCP configuration saved
     """
-    data = request.json or {}
+    global _mcp_enabled
+
+    data = request_json_object()
     enabled = data.get('enabled', False)
-    _ensure_env_file()
-    set_key(ENV_FILE, 'MCP_ENABLED', 'true' if enabled else 'false')
+    _write_env({'MCP_ENABLED': 'true' if enabled else 'false'})
     os.environ['MCP_ENABLED'] = 'true' if enabled else 'false'
+    _mcp_enabled = bool(enabled)
     return jsonify({'success': True, 'enabled': enabled})
 
 
+if __name__ == '__main__':
+    # Run as a script this module is __main__; register it as 'app' as well so
+    # mcp_server's `from app import ...` shares its config, records cache and
+    # MCP flag instead of importing a second copy of the module
+    sys.modules.setdefault('app', sys.modules[__name__])
+
 from mcp_server import register_mcp_routes
 register_mcp_routes(app, _auth)
 
 
+# The OpenAPI spec is fixed once every route is registered, so encode it a
+# single time and serve those bytes instead of re-running jsonify per request
+with app.app_context():
+    _apispec_body = _json_body(swagger.get_apispecs('apispec'))
+_apispec_etag = hashlib.blake2b(_apispec_body, digest_size=16).hexdigest()
+
+_flasgger_apispec_view = app.view_functions['flasgger.apispec']
+
+def serve_apispec():
+    if app.debug:
+        # Docstrings may change under the reloader; let flasgger rebuild
+        return _flasgger_apispec_view()
+    response = app.response_class(_apispec_body, mimetype='application/json')
+    response.cache_control.no_cache = True
+    response.set_etag(_apispec_etag)
+    return response.make_conditional(request)
+
+app.view_functions['flasgger.apispec'] = serve_apispec
+
+
 if __name__ == '__main__':
-    # Check if environment variables are set and log a warning if not
-    required_vars = ['DO_API_TOKEN', 'DO_DNS_ZONE']
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
+    # Warn about missing credentials, reading the config snapshot taken at import
+    missing_vars = [var for key, var in _CONFIG_ENV_KEYS.items() if not config.get(key)]
 
     if missing_vars:
-        print(f"WARNING: Missing environment variables: {', '.join(missing_vars)}")
-        print("The application will start, but you need to configure DigitalOcean credentials in Settings.")
-        print(f"Starting DigitalOcean DNS Manager (unconfigured)")
+        print("\n".join([
+            f"WARNING: Missing environment variables: {', '.join(missing_vars)}",
+            "The application will start, but you need to configure DigitalOcean credentials in Settings.",
+            "Starting DigitalOcean DNS Manager (unconfigured)",
+        ]))
     else:
-        print(f"Starting DigitalOcean DNS Manager for zone: {DNS_ZONE}")
+        print(f"Starting DigitalOcean DNS Manager for zone: {config['DNS_ZONE']}")
 
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Development server only; production runs under gunicorn (see Dockerfile).
+    # Each request gets its own thread, so slow DigitalOcean calls overlap
+    # instead of queueing behind one another (the shared session is thread-safe)
+    debug = os.getenv('FLASK_DEBUG', '').lower() in ('true', '1', 'yes')
+    app.run(debug=debug, host='0.0.0.0', port=5000, threaded=True)
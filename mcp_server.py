@@ -170,8 +170,8 @@ def _validate_bearer_token(req, auth_dict):
     auth_header = req.headers.get("Authorization", "")
     if not auth_header.startswith("Bearer "):
         return False
-    token = auth_header[7:]
-    return hmac.compare_digest(token, auth_dict["api_token"])
+    token = auth_header[7:].encode()
+    return hmac.compare_digest(token, auth_dict["api_token_bytes"])
 
 
 # ---------------------------------------------------------------------------
@@ -180,70 +180,37 @@ def _validate_bearer_token(req, auth_dict):
 
 def _format_records(raw_records, zone):
     """Convert raw DO API records into the standard response format."""
-    formatted = []
-    for record in raw_records:
-        rec = {
-            "name": record.get("name"),
-            "type": record.get("type"),
-            "ttl": record.get("ttl"),
-            "id": record.get("id"),
-            "fqdn": (
-                f"{record.get('name')}.{zone}"
-                if record.get("name") != "@"
-                else zone
-            ),
-        }
-        data_value = record.get("data")
-        rtype = record.get("type")
-        if rtype == "MX":
-            rec["values"] = [f"{record.get('priority', 0)} {data_value}"]
-        elif rtype == "SRV":
-            rec["values"] = [
-                f"{record.get('priority', 0)} {record.get('weight', 0)} "
-                f"{record.get('port', 0)} {data_value}"
-            ]
-        else:
-            rec["values"] = [data_value] if data_value else []
-        formatted.append(rec)
-    return formatted
+    from app import format_records
+
+    return format_records(raw_records, zone)
 
 
 def _prepare_record_data(record_type, values):
     """Parse values list into DO API record fields. Returns (fields_dict, error_string)."""
-    fields: dict = {}
-
-    if record_type in ("A", "AAAA", "TXT"):
-        fields["data"] = values[0]
-    elif record_type in ("CNAME", "NS"):
-        if len(values) > 1 and record_type == "CNAME":
-            return None, "CNAME records can only have one value"
-        val = values[0]
-        fields["data"] = val if val.endswith(".") else val + "."
-    elif record_type == "MX":
-        parts = values[0].split(" ", 1)
-        if len(parts) != 2:
-            return None, 'MX record must be in format: "priority exchange"'
-        fields["priority"] = int(parts[0])
-        exchange = parts[1]
-        fields["data"] = exchange if exchange.endswith(".") else exchange + "."
-    elif record_type == "SRV":
-        parts = values[0].split(" ", 3)
-        if len(parts) != 4:
-            return None, 'SRV record must be in format: "priority weight port target"'
-        fields["priority"] = int(parts[0])
-        fields["weight"] = int(parts[1])
-        fields["port"] = int(parts[2])
-        target = parts[3]
-        fields["data"] = target if target.endswith(".") else target + "."
-    else:
-        return None, f"Unsupported record type: {record_type}"
+    from app import apply_record_builder
 
+    fields: dict = {}
+    error = apply_record_builder(record_type, values, fields)
+    if error:
+        return None, error
     return fields, None
 
 
 def call_tool(name, arguments):
     """Execute an MCP tool and return a plain dict result."""
-    from app import fetch_all_domain_records, make_do_request, config, is_config_complete
+    from app import (
+        cache_deleted_record,
+        cache_saved_record,
+        do_error_message,
+        fetch_records_cached,
+        is_record_id,
+        lookup_record_id,
+        make_do_request,
+        records_endpoint,
+        send_record_request,
+        config,
+        is_config_complete,
+    )
 
     # ------------------------------------------------------------------
     if name == "health_check":
@@ -253,9 +220,9 @@ def call_tool(name, arguments):
     if name == "list_records":
         if not is_config_complete():
             return {"error": "DigitalOcean configuration is incomplete"}
-        records, err = fetch_all_domain_records()
+        records, err = fetch_records_cached()
         if err is not None:
-            error_msg = err.json().get("message", "Unknown error")
+            error_msg = do_error_message(err)
             return {"error": f"Failed to fetch records: {error_msg}"}
         return {
             "records": _format_records(records, config["DNS_ZONE"]),
@@ -281,11 +248,12 @@ def call_tool(name, arguments):
         record_data.update(extra)
 
         response = make_do_request(
-            "POST", f"/domains/{config['DNS_ZONE']}/records", record_data
+            "POST", records_endpoint(), record_data
         )
         if response.status_code in (200, 201):
+            cache_saved_record(response)
             return {"message": "Record created successfully", "name": record_name}
-        error_msg = response.json().get("message", "Unknown error")
+        error_msg = do_error_message(response)
         return {"error": f"Failed to create record: {error_msg}"}
 
     # ------------------------------------------------------------------
@@ -302,13 +270,12 @@ def call_tool(name, arguments):
         if not is_config_complete():
             return {"error": "DigitalOcean configuration is incomplete"}
 
+        if record_id and not is_record_id(record_id):
+            return {"error": "Field id must be a record ID"}
+        lookup = None
         if not record_id:
-            all_records, err = fetch_all_domain_records()
-            if all_records is not None:
-                for rec in all_records:
-                    if rec.get("name") == record_name and rec.get("type") == record_type:
-                        record_id = rec.get("id")
-                        break
+            lookup = (record_name, record_type)
+            record_id = lookup_record_id(*lookup)
             if not record_id:
                 return {"error": f"Record {record_name} ({record_type}) not found"}
 
@@ -318,12 +285,13 @@ def call_tool(name, arguments):
             return {"error": err}
         update_data.update(extra)
 
-        response = make_do_request(
-            "PUT", f"/domains/{config['DNS_ZONE']}/records/{record_id}", update_data
+        response, record_id = send_record_request(
+            "PUT", record_id, update_data, lookup
         )
         if response.status_code == 200:
+            cache_saved_record(response)
             return {"message": "Record updated successfully", "name": new_name}
-        error_msg = response.json().get("message", "Unknown error")
+        error_msg = do_error_message(response)
         return {"error": f"Failed to update record: {error_msg}"}
 
     # ------------------------------------------------------------------
@@ -335,24 +303,22 @@ def call_tool(name, arguments):
         if not is_config_complete():
             return {"error": "DigitalOcean configuration is incomplete"}
 
+        if record_id and not is_record_id(record_id):
+            return {"error": "Field id must be a record ID"}
+        lookup = None
         if not record_id:
-            all_records, err = fetch_all_domain_records()
-            if all_records is not None:
-                for rec in all_records:
-                    if rec.get("name") == record_name and rec.get("type") == record_type:
-                        record_id = rec.get("id")
-                        break
+            lookup = (record_name, record_type)
+            record_id = lookup_record_id(*lookup)
             if not record_id:
                 return {"error": f"Record {record_name} ({record_type}) not found"}
 
-        response = make_do_request(
-            "DELETE", f"/domains/{config['DNS_ZONE']}/records/{record_id}"
+        response, record_id = send_record_request(
+            "DELETE", record_id, lookup=lookup
         )
         if response.status_code == 204:
+            cache_deleted_record(record_id)
             return {"message": "Record deleted successfully", "name": record_name}
-        error_msg = (
-            response.json().get("message", "Unknown error") if response.text else "Unknown error"
-        )
+        error_msg = do_error_message(response)
         return {"error": f"Failed to delete record: {error_msg}"}
 
     # ------------------------------------------------------------------
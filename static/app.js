@@ -95,7 +95,7 @@ document.addEventListener('DOMContentLoaded', async () => {
 
     addRecordForm.addEventListener('submit', handleAddRecord);
     editRecordForm.addEventListener('submit', handleEditRecord);
-    refreshBtn.addEventListener('click', loadRecords);
+    refreshBtn.addEventListener('click', () => loadRecords(true));
     addRecordBtn.addEventListener('click', showAddModal);
     cancelEditBtn.addEventListener('click', hideEditModal);
     cancelAddBtn.addEventListener('click', hideAddModal);
@@ -118,11 +118,11 @@ document.addEventListener('DOMContentLoaded', async () => {
     });
 });
 
-async function loadRecords() {
+async function loadRecords(refresh = false) {
     try {
         showLoading(true);
         hideError();
-        const response = await fetch(`${API_BASE_URL}/records`);
+        const response = await fetch(`${API_BASE_URL}/records${refresh ? '?refresh=1' : ''}`);
         const data = await response.json();
         if (!response.ok) throw new Error(data.error || `HTTP error! status: ${response.status}`);
         zoneName.textContent = data.zone;
@@ -27,7 +27,8 @@ try:
     print(f"\n2. Attempting to list records from zone: {DNS_ZONE}")
     response = requests.get(
         f"https://api.digitalocean.com/v2/domains/{DNS_ZONE}/records",
-        headers=headers
+        headers=headers,
+        timeout=(3.05, 15)
     )
     
     if response.status_code == 200: